@@ -0,0 +1,241 @@
+"""Cross-model similarity and divergence analysis for any-llm Bench batches."""
+
+import hashlib
+import json
+import math
+import re
+from itertools import combinations
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .tasks import EXTRACT_FIELDS
+
+
+# Outputs are hashed into 2**20 buckets of unigram + bigram counts
+HASH_BITS = 20
+CHUNK_SIZE = 10_000
+
+_TOKEN_RE = re.compile(r"\w+")
+_BUCKET_MASK = np.uint64((1 << HASH_BITS) - 1)
+_BIGRAM_SALT = np.uint64(0x9E3779B97F4A7C15)
+
+
+def analyze_batch(batch: Dict[str, Any], top_k: int = 20, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Compare every pair of models over a batch from ``run_batch``.
+
+    Text similarity is the cosine between hashed n-gram count vectors, computed
+    per prompt for each model pair, so cost grows linearly with the number of
+    prompts. For ``extract_fields`` the parsed JSON fields are compared too.
+    Failed runs (``ok`` is False) are counted separately and left out of the
+    similarity, agreement and divergence statistics.
+
+    Returns:
+        {
+            "failures": {model: int},
+            "pairs": [{"model_a", "model_b", "compared", "failures": {model: int},
+                       "mean_similarity"|None, "median_similarity"|None,
+                       "field_agreement": {field: float|None}|None}],
+            "divergent": [{"index", "prompt", "divergence", "min_similarity",
+                           "least_similar_pair", "field_diffs"|None, "outputs"}]
+        }
+    """
+
+    models = batch["models"]
+    results = batch["results"]
+    task = batch["task"]
+    n_prompts = len(results)
+    pairs = list(combinations(range(len(models)), 2))
+
+    # A pair is only compared on prompts where both models succeeded
+    ok = np.array([[bool(result["ok"]) for result in row] for row in results], dtype=bool).reshape(n_prompts, len(models))
+    valid = np.zeros((n_prompts, len(pairs)), dtype=bool)
+    for p, (a, b) in enumerate(pairs):
+        valid[:, p] = ok[:, a] & ok[:, b]
+
+    similarity = np.full((n_prompts, len(pairs)), np.nan)
+    token_hashes: Dict[str, int] = {}
+
+    for start in range(0, n_prompts, chunk_size):
+        stop = min(start + chunk_size, n_prompts)
+        sketches = [
+            _sketch([row[j]["output"] for row in results[start:stop]], token_hashes)
+            for j in range(len(models))
+        ]
+        for p, (a, b) in enumerate(pairs):
+            similarity[start:stop, p] = _cosine(sketches[a], sketches[b], stop - start)
+    similarity[~valid] = np.nan
+
+    # Field mismatches for extract_fields: shape (prompts, pairs, fields)
+    mismatch = None
+    if task == "extract_fields":
+        fields = [[_parse_fields(result["output"]) for result in row] for row in results]
+        mismatch = np.zeros((n_prompts, len(pairs), len(EXTRACT_FIELDS)), dtype=bool)
+        for p, (a, b) in enumerate(pairs):
+            mismatch[:, p, :] = np.array(
+                [[x != y for x, y in zip(row[a], row[b])] for row in fields], dtype=bool
+            ).reshape(n_prompts, len(EXTRACT_FIELDS))
+        mismatch[~valid] = False
+
+    # Rank prompts: field disagreement first (extract_fields), then text divergence.
+    # Prompts without a single successful pair have nothing to rank.
+    n_valid = valid.sum(axis=1)
+    ranked = np.flatnonzero(n_valid)
+    text_divergence = np.zeros(n_prompts)
+    text_divergence[ranked] = 1.0 - np.nanmean(similarity[ranked], axis=1)
+    if mismatch is not None:
+        field_divergence = np.zeros(n_prompts)
+        field_divergence[ranked] = mismatch[ranked].sum(axis=(1, 2)) / (n_valid[ranked] * len(EXTRACT_FIELDS))
+        order = ranked[np.lexsort((-text_divergence[ranked], -field_divergence[ranked]))]
+        divergence = field_divergence
+    else:
+        order = ranked[np.argsort(-text_divergence[ranked], kind="stable")]
+        divergence = text_divergence
+    order = order[:top_k]
+
+    failures = (~ok).sum(axis=0)
+    pair_summaries = []
+    for p, (a, b) in enumerate(pairs):
+        compared = int(valid[:, p].sum())
+        field_agreement = None
+        if mismatch is not None:
+            agreement = 1.0 - mismatch[valid[:, p], p, :].mean(axis=0) if compared else [None] * len(EXTRACT_FIELDS)
+            field_agreement = {
+                name: round(float(value), 4) if value is not None else None
+                for name, value in zip(EXTRACT_FIELDS, agreement)
+            }
+        pair_similarity = similarity[valid[:, p], p]
+        pair_summaries.append({
+            "model_a": models[a],
+            "model_b": models[b],
+            "compared": compared,
+            "failures": {models[a]: int(failures[a]), models[b]: int(failures[b])},
+            "mean_similarity": round(float(pair_similarity.mean()), 4) if compared else None,
+            "median_similarity": round(float(np.median(pair_similarity)), 4) if compared else None,
+            "field_agreement": field_agreement
+        })
+
+    divergent = []
+    for i in order.tolist():
+        worst = int(np.nanargmin(similarity[i]))
+        a, b = pairs[worst]
+        field_diffs = None
+        if mismatch is not None:
+            field_diffs = [
+                {"field": name, "values": {models[j]: _raw_field(results[i][j]["output"], name) for j in range(len(models)) if ok[i, j]}}
+                for k, name in enumerate(EXTRACT_FIELDS)
+                if mismatch[i, :, k].any()
+            ]
+        divergent.append({
+            "index": i,
+            "prompt": batch["prompts"][i],
+            "divergence": round(float(divergence[i]), 4),
+            "min_similarity": round(float(similarity[i, worst]), 4),
+            "least_similar_pair": [models[a], models[b]],
+            "field_diffs": field_diffs,
+            "outputs": {models[j]: results[i][j]["output"] or "" for j in range(len(models)) if ok[i, j]}
+        })
+
+    return {
+        "failures": {model: int(count) for model, count in zip(models, failures)},
+        "pairs": pair_summaries,
+        "divergent": divergent
+    }
+
+
+def _sketch(outputs: List[Optional[str]], token_hashes: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash outputs into sorted (row, bucket) keys with n-gram counts."""
+
+    token_lists = [_TOKEN_RE.findall((output or "").lower()) for output in outputs]
+    lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+    flat = [token for tokens in token_lists for token in tokens]
+
+    # Stable per-token hashes keep buckets independent of chunking and input order
+    for token in set(flat).difference(token_hashes):
+        token_hashes[token] = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+    ids = np.fromiter(map(token_hashes.__getitem__, flat), dtype=np.uint64, count=len(flat))
+    rows = np.repeat(np.arange(len(outputs), dtype=np.int64), lengths)
+
+    # Bigrams must not span two outputs
+    same_row = rows[1:] == rows[:-1]
+    bigrams = _mix(ids[:-1][same_row] ^ _BIGRAM_SALT) ^ ids[1:][same_row]
+
+    buckets = np.concatenate([_mix(ids), _mix(bigrams)]) & _BUCKET_MASK
+    keys = (np.concatenate([rows, rows[1:][same_row]]) << HASH_BITS) | buckets.astype(np.int64)
+    keys, counts = np.unique(keys, return_counts=True)
+    return keys, counts.astype(np.float64)
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """Scramble uint64 values (splitmix64 finalizer) so buckets spread evenly."""
+
+    x = values.copy()
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return x
+
+
+def _cosine(sketch_a: Tuple[np.ndarray, np.ndarray], sketch_b: Tuple[np.ndarray, np.ndarray], n_rows: int) -> np.ndarray:
+    """Row-wise cosine similarity between two sketches of the same prompts."""
+
+    keys_a, counts_a = sketch_a
+    keys_b, counts_b = sketch_b
+
+    norm_a = np.sqrt(np.bincount(keys_a >> HASH_BITS, weights=counts_a ** 2, minlength=n_rows))
+    norm_b = np.sqrt(np.bincount(keys_b >> HASH_BITS, weights=counts_b ** 2, minlength=n_rows))
+
+    common, idx_a, idx_b = np.intersect1d(keys_a, keys_b, assume_unique=True, return_indices=True)
+    dot = np.bincount(common >> HASH_BITS, weights=counts_a[idx_a] * counts_b[idx_b], minlength=n_rows)
+
+    # Two empty outputs agree; one empty output shares nothing with the other
+    denom = norm_a * norm_b
+    both_empty = (norm_a == 0) & (norm_b == 0)
+    return np.where(denom > 0, dot / np.where(denom > 0, denom, 1.0), both_empty.astype(np.float64))
+
+
+def _parse_fields(output: Optional[str]) -> Tuple[Any, ...]:
+    """Parse an extract_fields output into normalized field values (None if missing or invalid)."""
+
+    data = _load_json(output)
+    return tuple(_normalize_field(data.get(name)) for name in EXTRACT_FIELDS)
+
+
+def _raw_field(output: Optional[str], name: str) -> Any:
+    """Return the field value as the model wrote it, for display."""
+
+    return _load_json(output).get(name)
+
+
+def _load_json(output: Optional[str]) -> Dict[str, Any]:
+    try:
+        data = json.loads(output or "")
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _normalize_field(value: Any) -> Optional[Any]:
+    """Normalize a field so that formatting differences (case, $ and commas) are not diffs."""
+
+    if value is None:
+        return value
+    if isinstance(value, bool):
+        # True == 1.0 in Python, so bools compare as text to keep them apart from numbers
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        try:
+            number = float(value)
+        except OverflowError:
+            return str(value)
+        # NaN never equals itself, so non-finite values compare as their text
+        return round(number, 2) if math.isfinite(number) else str(value).casefold()
+    text = str(value).strip()
+    try:
+        number = float(text.replace("$", "").replace(",", ""))
+    except ValueError:
+        return text.casefold() or None
+    return round(number, 2) if math.isfinite(number) else text.casefold()
@@ -2,7 +2,7 @@
 
 import time
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from .tasks import build_prompt
 
 # Try to import any_llm, fall back to mock if not available
@@ -173,3 +173,24 @@ def run_comparison(model1: str, model2: str, task: str, prompt: str, mock_mode:
         "model2": result2,
         "mock_mode": mock_mode
     }
+
+
+def run_batch(models: List[str], task: str, prompts: List[str], mock_mode: bool = False) -> Dict[str, Any]:
+    """Run every prompt through every model and return combined batch results.
+
+    ``results[i][j]`` holds the ``run_once`` result for ``prompts[i]`` on ``models[j]``.
+    """
+    
+    results = [
+        [run_once(model_id, task, prompt, mock_mode) for model_id in models]
+        for prompt in prompts
+    ]
+    
+    return {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "task": task,
+        "models": list(models),
+        "prompts": list(prompts),
+        "results": results,
+        "mock_mode": mock_mode
+    }
@@ -3,6 +3,7 @@
 import json
 import os
 from typing import Dict, Any
+from .analysis import analyze_batch
 
 
 def write_markdown(path: str, context: Dict[str, Any]) -> None:
@@ -74,11 +75,89 @@ def write_json(path: str, context: Dict[str, Any]) -> None:
         json.dump(context, f, indent=2)
 
 
-def generate_report_filename(timestamp: str) -> str:
+def write_batch_markdown(path: str, context: Dict[str, Any]) -> None:
+    """Write a Markdown report for a batch run, including its divergence analysis."""
+    
+    analysis = context["analysis"]
+    
+    # Create runs directory if it doesn't exist
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    with open(path, 'w') as f:
+        f.write(f"# Batch Comparison Report\n\n")
+        f.write(f"**Timestamp:** {context['timestamp']}\n")
+        f.write(f"**Task:** {context['task']}\n")
+        f.write(f"**Models:** {', '.join(context['models'])}\n")
+        f.write(f"**Prompts:** {len(context['prompts'])}\n")
+        f.write(f"**Mock Mode:** {'Yes' if context.get('mock_mode', False) else 'No'}\n\n")
+        
+        # Pairwise similarity table
+        f.write("## Pairwise Similarity\n\n")
+        has_fields = any(pair["field_agreement"] for pair in analysis["pairs"])
+        header = "| Model A | Model B | Compared | Mean Similarity | Median Similarity |"
+        divider = "|---------|---------|----------|-----------------|-------------------|"
+        if has_fields:
+            field_names = list(analysis["pairs"][0]["field_agreement"])
+            header += "".join(f" {name} Agreement |" for name in field_names)
+            divider += "".join("-" * (len(name) + 12) + "|" for name in field_names)
+        f.write(header + "\n")
+        f.write(divider + "\n")
+        
+        for pair in analysis["pairs"]:
+            mean = f"{pair['mean_similarity']:.3f}" if pair["mean_similarity"] is not None else "N/A"
+            median = f"{pair['median_similarity']:.3f}" if pair["median_similarity"] is not None else "N/A"
+            row = f"| {_cell(pair['model_a'])} | {_cell(pair['model_b'])} | {pair['compared']} | {mean} | {median} |"
+            if has_fields:
+                row += "".join(f" {value:.1%} |" if value is not None else " N/A |" for value in pair["field_agreement"].values())
+            f.write(row + "\n")
+        f.write("\n")
+        
+        # Failed runs are excluded from the comparison above
+        f.write("## Failures\n\n")
+        f.write("| Model | Failed Runs |\n")
+        f.write("|-------|-------------|\n")
+        for model, count in analysis["failures"].items():
+            f.write(f"| {_cell(model)} | {count} |\n")
+        f.write("\n")
+        
+        # Most divergent prompts
+        f.write("## Most Divergent Prompts\n\n")
+        
+        for entry in analysis["divergent"]:
+            f.write(f"### Prompt #{entry['index']} (divergence {entry['divergence']:.3f})\n\n")
+            
+            prompt_snippet = entry['prompt'][:200] + "..." if len(entry['prompt']) > 200 else entry['prompt']
+            f.write(f"**Prompt:**\n```\n{prompt_snippet}\n```\n\n")
+            f.write(f"**Least similar pair:** {' vs '.join(entry['least_similar_pair'])} ({entry['min_similarity']:.3f})\n\n")
+            
+            if entry["field_diffs"]:
+                models = list(entry["outputs"])
+                f.write("| Field | " + " | ".join(_cell(model) for model in models) + " |\n")
+                f.write("|-------|" + "|".join("---" for _ in models) + "|\n")
+                for diff in entry["field_diffs"]:
+                    values = [_cell(json.dumps(diff["values"][model])) for model in models]
+                    f.write(f"| {_cell(diff['field'])} | " + " | ".join(values) + " |\n")
+                f.write("\n")
+            else:
+                for model, output in entry["outputs"].items():
+                    output_snippet = output[:300] + "..." if len(output) > 300 else output
+                    f.write(f"**{model}:**\n```\n{output_snippet}\n```\n\n")
+        
+        # Footer
+        f.write("---\n")
+        f.write("*Generated by any-llm Bench*\n")
+
+
+def _cell(value: Any) -> str:
+    """Escape a value for use inside a Markdown table cell."""
+    return str(value).replace("|", "\\|")
+
+
+def generate_report_filename(timestamp: str, prefix: str = "run") -> str:
     """Generate a filename for the report based on timestamp."""
     # Convert timestamp to filesystem-safe format
     safe_timestamp = timestamp.replace(":", "-").replace(" ", "_")
-    return f"run-{safe_timestamp}"
+    return f"{prefix}-{safe_timestamp}"
 
 
 def export_report(context: Dict[str, Any], base_dir: str = "runs") -> Dict[str, str]:
@@ -95,3 +174,22 @@ def export_report(context: Dict[str, Any], base_dir: str = "runs") -> Dict[str,
         "markdown": md_path,
         "json": json_path
     }
+
+
+def export_batch_report(context: Dict[str, Any], base_dir: str = "runs", top_k: int = 20) -> Dict[str, str]:
+    """Analyze a batch run, export Markdown and JSON reports and return the file paths."""
+    
+    # Export a copy so the caller's batch is left untouched
+    context = dict(context, analysis=analyze_batch(context, top_k=top_k))
+    
+    filename = generate_report_filename(context["timestamp"], prefix="batch")
+    md_path = os.path.join(base_dir, f"{filename}.md")
+    json_path = os.path.join(base_dir, f"{filename}.json")
+    
+    write_batch_markdown(md_path, context)
+    write_json(json_path, context)
+    
+    return {
+        "markdown": md_path,
+        "json": json_path
+    }
@@ -3,6 +3,10 @@
 from typing import List, Dict
 
 
+# Fields requested by the extract_fields task
+EXTRACT_FIELDS = ["vendor", "total", "date"]
+
+
 def build_prompt(task: str, user_input: str) -> List[Dict[str, str]]:
     """Build OpenAI-style messages for the given task and user input."""
     
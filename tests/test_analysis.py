@@ -0,0 +1,140 @@
+"""Tests for cross-model similarity and divergence analysis."""
+
+import math
+import random
+import re
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from anybench.analysis import analyze_batch, _cosine, _normalize_field, _sketch
+
+
+def _result(output, ok=True):
+    return {"output": output, "ok": ok}
+
+
+def _batch(task, rows, models=("a", "b")):
+    return {
+        "task": task,
+        "models": list(models),
+        "prompts": [f"prompt {i}" for i in range(len(rows))],
+        "results": [[_result(*cell) if isinstance(cell, tuple) else _result(cell) for cell in row] for row in rows],
+    }
+
+
+def _reference_cosine(text_a, text_b):
+    """Brute-force cosine over unigram + bigram counts."""
+
+    def grams(text):
+        tokens = re.findall(r"\w+", text.lower())
+        return Counter(tokens) + Counter(zip(tokens, tokens[1:]))
+
+    a, b = grams(text_a), grams(text_b)
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    if not norm:
+        return 1.0 if not a and not b else 0.0
+    return sum(a[k] * b[k] for k in a) / norm
+
+
+def _random_outputs(rng, n):
+    words = [f"w{i}" for i in range(50)]
+    return [" ".join(rng.choices(words, k=rng.randint(0, 30))) for _ in range(n)]
+
+
+def test_cosine_matches_reference():
+    rng = random.Random(0)
+    outputs_a = _random_outputs(rng, 200) + ["The cat sat", ""]
+    outputs_b = _random_outputs(rng, 200) + ["the CAT sat", ""]
+    token_hashes = {}
+
+    similarity = _cosine(_sketch(outputs_a, token_hashes), _sketch(outputs_b, token_hashes), len(outputs_a))
+
+    expected = [_reference_cosine(a, b) for a, b in zip(outputs_a, outputs_b)]
+    # Hash collisions in 2**20 buckets are vanishingly rare at this vocabulary size
+    np.testing.assert_allclose(similarity, expected, atol=1e-9)
+
+
+def test_chunk_size_does_not_change_results():
+    rng = random.Random(1)
+    rows = [list(zip(_random_outputs(rng, 3), [True] * 3)) for _ in range(500)]
+    batch = _batch("summarize", rows, models=("a", "b", "c"))
+
+    assert analyze_batch(batch, top_k=10, chunk_size=7) == analyze_batch(batch, top_k=10)
+
+
+def test_empty_outputs():
+    batch = _batch("summarize", [("same text", "same text"), ("", ""), ("text", "")])
+    analysis = analyze_batch(batch)
+
+    assert analysis["divergent"][0]["index"] == 2
+    assert [entry["min_similarity"] for entry in analysis["divergent"]] == [0.0, 1.0, 1.0]
+
+
+def test_failed_runs_are_excluded():
+    rows = [
+        ("one output", "another output"),
+        (("", False), ("", False)),
+        (("", False), "an answer"),
+        (None, None),
+    ]
+    analysis = analyze_batch(_batch("summarize", rows))
+    pair = analysis["pairs"][0]
+
+    assert analysis["failures"] == {"a": 2, "b": 1}
+    assert pair["failures"] == {"a": 2, "b": 1}
+    assert pair["compared"] == 2
+    assert [entry["index"] for entry in analysis["divergent"]] == [0, 3]
+
+
+def test_all_failed_pair_has_no_statistics():
+    rows = [(("", False), ("", False))]
+    analysis = analyze_batch(_batch("extract_fields", rows))
+    pair = analysis["pairs"][0]
+
+    assert pair["compared"] == 0
+    assert pair["mean_similarity"] is None
+    assert pair["field_agreement"] == {"vendor": None, "total": None, "date": None}
+    assert analysis["divergent"] == []
+
+
+def test_field_diffs():
+    rows = [
+        ('{"vendor": "Acme", "total": "$1,250", "date": "2024-01-15"}',
+         '{"vendor": "ACME ", "total": 1250, "date": "2024-01-16"}'),
+        ('{"vendor": "Acme", "total": "NaN", "date": null}',
+         '{"vendor": "Acme", "total": "NaN", "date": null}'),
+        (('not json', False), '{"vendor": "Acme", "total": 1, "date": null}'),
+    ]
+    analysis = analyze_batch(_batch("extract_fields", rows))
+
+    assert analysis["pairs"][0]["field_agreement"] == {"vendor": 1.0, "total": 1.0, "date": 0.5}
+    top = analysis["divergent"][0]
+    assert top["index"] == 0
+    assert top["field_diffs"] == [{"field": "date", "values": {"a": "2024-01-15", "b": "2024-01-16"}}]
+
+
+@pytest.mark.parametrize("a, b", [
+    ("$1,250", 1250),
+    ("1250.00", 1250.0),
+    (" Acme Corp ", "acme corp"),
+    ("NaN", float("nan")),
+    (float("inf"), "inf"),
+    (10 ** 400, "1" + "0" * 400),
+])
+def test_normalize_field_equal(a, b):
+    assert _normalize_field(a) == _normalize_field(b)
+
+
+@pytest.mark.parametrize("a, b", [
+    (True, 1),
+    (False, 0),
+    (True, 1.0),
+])
+def test_normalize_field_bool_differs_from_number(a, b):
+    assert _normalize_field(a) != _normalize_field(b)
+
+
+def test_normalize_field_empty_string_is_none():
+    assert _normalize_field("  ") is None
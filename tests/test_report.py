@@ -0,0 +1,36 @@
+"""Tests for batch report export."""
+
+from anybench.bench import run_batch
+from anybench.report import export_batch_report
+
+
+def test_export_batch_report_recomputes_analysis(tmp_path):
+    batch = run_batch(["mock:a", "mock:b"], "summarize", ["one", "two", "three"], mock_mode=True)
+
+    export_batch_report(batch, base_dir=str(tmp_path), top_k=3)
+    files = export_batch_report(batch, base_dir=str(tmp_path), top_k=1)
+
+    assert "analysis" not in batch
+    with open(files["markdown"]) as f:
+        assert f.read().count("### Prompt #") == 1
+
+
+def test_batch_report_escapes_table_pipes(tmp_path):
+    batch = {
+        "timestamp": "2024-01-15 14:30:25",
+        "task": "extract_fields",
+        "models": ["mock:a|b", "mock:c"],
+        "prompts": ["invoice"],
+        "results": [[
+            {"output": '{"vendor": "A | B Corp", "total": 1, "date": null}', "ok": True},
+            {"output": '{"vendor": "C Corp", "total": 1, "date": null}', "ok": True},
+        ]],
+        "mock_mode": True
+    }
+
+    files = export_batch_report(batch, base_dir=str(tmp_path))
+
+    with open(files["markdown"]) as f:
+        report = f.read()
+    assert r'| vendor | "A \| B Corp" | "C Corp" |' in report
+    assert r"| mock:a\|b | 0 |" in report